@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the CSV row representation.
+
+Compares peak memory of the old representation (a dict per row from
+csv.DictReader) against ExperimentRow objects. Both build each Notion
+payload inside the sync loop, one row at a time, as the sync always has,
+so the difference comes from the rows alone. This runs without connecting
+to Notion.
+
+Usage: python bench_memory.py [ROWS]
+"""
+
+import csv
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sync_to_notion import CSV_FILE, read_csv_data, create_notion_page_properties
+
+DEFAULT_ROWS = 100_000
+
+
+def write_large_csv(path: str, rows: int):
+    """Write a synthetic catalog by repeating the real CSV with unique names."""
+    with open(CSV_FILE, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        template = list(reader)
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(rows):
+            row = dict(template[i % len(template)])
+            row["Experiment_Name"] = f"{row['Experiment_Name']} #{i}"
+            writer.writerow(row)
+
+
+def legacy_representation(path: str) -> int:
+    """Dict rows from csv.DictReader, payloads built one at a time."""
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    count = 0
+    for row in rows:
+        create_notion_page_properties(row)
+        count += 1
+    return count
+
+
+def compact_representation(path: str) -> int:
+    """ExperimentRow objects, payloads built one at a time."""
+    rows = read_csv_data(path)
+    count = 0
+    for row in rows:
+        create_notion_page_properties(row)
+        count += 1
+    return count
+
+
+def measure(func, path: str):
+    """Return (peak bytes, seconds) for one run of func."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.csv")
+        write_large_csv(path, rows)
+
+        print("="*60)
+        print(f"Memory benchmark: {rows:,} rows")
+        print("="*60)
+
+        legacy_peak, legacy_time = measure(legacy_representation, path)
+        compact_peak, compact_time = measure(compact_representation, path)
+
+        print(f"Legacy (dict rows):      {legacy_peak / 1e6:8.1f} MB peak  {legacy_time:6.2f}s")
+        print(f"Compact (slotted rows):  {compact_peak / 1e6:8.1f} MB peak  {compact_time:6.2f}s")
+        print(f"Reduction: {legacy_peak / compact_peak:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Parse-time benchmark for multi-file catalogs.
+
+Splits a synthetic catalog into shards and times reading them one after
+another with read_csv_data() against read_csv_files(), which parses the
+shards in a process pool and merges them in this process. This runs
+without connecting to Notion.
+
+Usage: python bench_parse.py [ROWS] [SHARDS] [WORKERS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from bench_memory import write_large_csv
+from sync_to_notion import read_csv_data, read_csv_files
+
+DEFAULT_ROWS = 200_000
+DEFAULT_SHARDS = 4
+
+
+def write_shards(directory: str, rows: int, shards: int) -> list:
+    """Write the catalog split into equal shards; return their paths."""
+    source = os.path.join(directory, "catalog.csv")
+    write_large_csv(source, rows)
+    with open(source, 'r', encoding='utf-8') as f:
+        header, *lines = f.readlines()
+    os.remove(source)
+
+    paths = []
+    size = -(-len(lines) // shards)
+    for i in range(shards):
+        path = os.path.join(directory, f"shard-{i}.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines([header] + lines[i * size:(i + 1) * size])
+        paths.append(path)
+    return paths
+
+
+def serial(paths: list) -> int:
+    """Read each shard in turn in this process."""
+    return sum(len(read_csv_data(path)) for path in paths)
+
+
+def parallel(paths: list, workers) -> int:
+    """Parse the shards in a process pool and merge them."""
+    return len(read_csv_files(paths, workers=workers))
+
+
+def measure(func, *args):
+    """Return (result, seconds) for one run of func."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    shards = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SHARDS
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_shards(tmp, rows, shards)
+
+        print("="*60)
+        print(f"Parse benchmark: {rows:,} rows in {shards} files, "
+              f"{workers or os.cpu_count()} worker(s) on {os.cpu_count()} CPU(s)")
+        print("="*60)
+
+        serial_rows, serial_time = measure(serial, paths)
+        parallel_rows, parallel_time = measure(parallel, paths, workers)
+        assert serial_rows == parallel_rows, (serial_rows, parallel_rows)
+
+        print(f"Serial (read_csv_data per file): {serial_time:6.2f}s")
+        print(f"Parallel (read_csv_files):       {parallel_time:6.2f}s")
+        print(f"Speedup: {serial_time / parallel_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
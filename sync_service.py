@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Local sync service for running many Notion syncs against shared tokens.
+
+Accepts sync jobs over HTTP, queues them and runs them on a worker pool.
+All jobs that use the same integration token draw from one shared rate
+budget, so concurrent syncs from different teams don't throttle each other
+into failure. Jobs for the same database run one at a time, and the queue
+takes turns between databases so one busy team can't starve the others.
+
+API:
+    POST /jobs        Submit a job: {"csv_path": "...", "database_id": "...",
+                      "token": "...", "before": "...", "after": "..."}
+                      Only csv_path (a file, directory or glob) is required;
+                      database_id and token default to NOTION_DATABASE_ID
+                      and NOTION_TOKEN.
+    GET  /jobs        List all jobs
+    GET  /jobs/<id>   Job status and result
+
+Usage: python sync_service.py [--port 8765] [--workers 4] [--rate 3]
+"""
+
+import argparse
+import itertools
+import json
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from sync_to_notion import (
+    CIRCUIT_BREAKER_THRESHOLD,
+    NOTION_DATABASE_ID,
+    NOTION_RATE_LIMIT,
+    NOTION_TOKEN,
+    RateLimitedClient,
+    RateLimiter,
+    SyncError,
+    estimate_database_size,
+    expand_inputs,
+    load_changes,
+    write_changes,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job:
+    """A sync job and its outcome."""
+
+    def __init__(self, job_id: str, csv_path: str, database_id: str, token: str,
+                 before: Optional[str] = None, after: str = "HEAD"):
+        self.id = job_id
+        self.csv_path = csv_path
+        self.database_id = database_id
+        self.token = token
+        self.before = before
+        self.after = after
+        self.status = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = datetime.now().isoformat(timespec="seconds")
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        # The token is deliberately left out
+        return {
+            "id": self.id,
+            "csv_path": self.csv_path,
+            "database_id": self.database_id,
+            "before": self.before,
+            "after": self.after,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobQueue:
+    """
+    Job queue that is FIFO per database and round-robin across databases.
+
+    A database with a running job is skipped until that job is done, so two
+    syncs never write to the same database at once.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[str, deque]" = OrderedDict()
+        self._running = set()
+        self._closed = False
+
+    def put(self, job: Job):
+        with self._cond:
+            self._pending.setdefault(job.database_id, deque()).append(job)
+            self._cond.notify()
+
+    def get(self) -> Optional[Job]:
+        """Wait for the next runnable job; returns None once the queue is closed."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                for database_id, jobs in self._pending.items():
+                    if database_id not in self._running:
+                        job = jobs.popleft()
+                        if jobs:
+                            self._pending.move_to_end(database_id)
+                        else:
+                            del self._pending[database_id]
+                        self._running.add(database_id)
+                        return job
+                self._cond.wait()
+
+    def done(self, job: Job):
+        with self._cond:
+            self._running.discard(job.database_id)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class SyncService:
+    """Runs queued sync jobs on a worker pool with one rate budget per token."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, rate: float = NOTION_RATE_LIMIT,
+                 notion_url: Optional[str] = None):
+        self.workers = workers
+        self.rate = rate
+        self.notion_url = notion_url
+        self.queue = JobQueue()
+        self._jobs: Dict[str, Job] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"sync-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self.queue.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, spec: Dict[str, Any]) -> Job:
+        """Validate a job request and queue it. Raises ValueError if it is invalid."""
+        csv_path = spec.get("csv_path")
+        database_id = spec.get("database_id") or NOTION_DATABASE_ID
+        token = spec.get("token") or NOTION_TOKEN
+
+        if not csv_path:
+            raise ValueError("csv_path is required")
+        before = spec.get("before")
+        after = spec.get("after") or "HEAD"
+        try:
+            expand_inputs(csv_path, (before, after) if before is not None else ())
+        except SyncError as e:
+            raise ValueError(str(e))
+        if not database_id:
+            raise ValueError("database_id is required (no NOTION_DATABASE_ID set)")
+        if not token:
+            raise ValueError("token is required (no NOTION_TOKEN set)")
+
+        with self._lock:
+            job = Job(str(next(self._ids)), csv_path, database_id, token, before, after)
+            self._jobs[job.id] = job
+        self.queue.put(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def limiter_for(self, token: str) -> RateLimiter:
+        """Return the rate limiter shared by every job using this token."""
+        with self._lock:
+            if token not in self._limiters:
+                self._limiters[token] = RateLimiter(self.rate)
+            return self._limiters[token]
+
+    def create_client(self, token: str) -> RateLimitedClient:
+        options = {"auth": token}
+        if self.notion_url:
+            options["base_url"] = self.notion_url
+        return RateLimitedClient(self.limiter_for(token), **options)
+
+    def run_job(self, job: Job):
+        job.status = RUNNING
+        job.started_at = datetime.now().isoformat(timespec="seconds")
+        try:
+            revisions = (job.before, job.after) if job.before is not None else ()
+            csv_files = expand_inputs(job.csv_path, revisions)
+            delta = load_changes(csv_files, job.before, job.after)
+            if job.before is not None and len(delta) == 0:
+                job.result = {"created": 0, "updated": 0, "archived": 0, "errors": []}
+            else:
+                notion = self.create_client(job.token)
+                job.result = write_changes(
+                    notion,
+                    job.database_id,
+                    delta.added + delta.modified,
+                    delta.removed,
+                    probe=job.before is None or len(delta) > CIRCUIT_BREAKER_THRESHOLD,
+                    database_size=estimate_database_size(csv_files)
+                )
+            job.status = SUCCEEDED
+        except SyncError as e:
+            job.status = FAILED
+            job.error = str(e)
+        except Exception as e:
+            job.status = FAILED
+            job.error = f"Unexpected error: {e}"
+        finally:
+            job.finished_at = datetime.now().isoformat(timespec="seconds")
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            try:
+                self.run_job(job)
+            finally:
+                self.queue.done(job)
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    """JSON API in front of a SyncService (set as `server.service`)."""
+
+    def _send_json(self, status: int, body: Any):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/jobs":
+            self._send_json(200, [job.to_dict() for job in service.list_jobs()])
+        elif self.path.startswith("/jobs/"):
+            job = service.get_job(self.path[len("/jobs/"):])
+            if job is None:
+                self._send_json(404, {"error": "job not found"})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(spec, dict):
+                raise ValueError("request body must be a JSON object")
+            job = self.server.service.submit(spec)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(202, job.to_dict())
+
+    def log_message(self, format, *args):
+        print(f"[service] {self.address_string()} {format % args}")
+
+
+def create_server(service: SyncService, host: str = DEFAULT_HOST,
+                  port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Create the HTTP server for a service (port 0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), SyncRequestHandler)
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Notion sync service.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"number of jobs to run at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--rate", type=float, default=NOTION_RATE_LIMIT,
+                        help=f"requests per second allowed per token (default: {NOTION_RATE_LIMIT})")
+    parser.add_argument("--notion-url", help="Notion API base URL, e.g. a local stand-in for testing")
+    args = parser.parse_args()
+
+    service = SyncService(args.workers, args.rate, args.notion_url)
+    service.start()
+    server = create_server(service, args.host, args.port)
+
+    print(f"Sync service listening on http://{args.host}:{server.server_port}")
+    print(f"Workers: {args.workers}, rate budget: {args.rate} requests/second per token")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,36 @@ This script reads the planned_research_main.csv file and syncs it to a Notion da
 Each row in the CSV becomes a page in the Notion database with corresponding properties.
 """
 
+import argparse
 import csv
+import fnmatch
+import glob
+import io
+import itertools
+import json
+import math
+import multiprocessing
 import os
+import re
+import subprocess
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, NamedTuple, Optional, Tuple
 
 try:
+    import httpx
     from notion_client import Client
+    from notion_client.errors import (
+        APIErrorCode,
+        APIResponseError,
+        HTTPResponseError,
+        RequestTimeoutError,
+    )
     from dotenv import load_dotenv
 except ImportError:
     print("Error: Required packages not installed.")
@@ -27,9 +49,76 @@ load_dotenv()
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
 CSV_FILE = "planned_research_main.csv"
+PARSE_WORKERS = None  # Processes used to parse multiple input files (None = one per CPU)
 
+# CSV columns, in file order
+CSV_COLUMNS = (
+    "Station",
+    "Experiment_Name",
+    "Discipline",
+    "Country_Institution",
+    "Timeline_Status",
+    "Objectives",
+    "Expected_Outcomes",
+    "Principal_Investigator",
+    "Mission_Module"
+)
 
-def validate_config():
+# Columns with few distinct values, stored once per value instead of once per row
+INTERNED_COLUMNS = frozenset({
+    "Station",
+    "Discipline",
+    "Country_Institution",
+    "Timeline_Status",
+    "Principal_Investigator",
+    "Mission_Module"
+})
+
+# Notion allows an average of three requests per second per integration
+NOTION_RATE_LIMIT = 3.0
+
+# Adaptive write concurrency (AIMD)
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 8
+LATENCY_SPIKE_FACTOR = 3.0  # A request this many times slower than usual counts as a spike
+LATENCY_SPIKE_FLOOR = 0.25  # ... provided it also took at least this many seconds
+DECREASE_FACTOR = 0.5  # Multiply concurrency by this on a 429, server error or spike
+MIN_LEARNING_REQUESTS = 10  # Don't persist what was learned from tinier runs
+SYNC_STATE_FILE = os.getenv("SYNC_STATE_FILE", ".sync_state.json")
+
+# Page lookup
+KEY_PROPERTY = "Name"  # Title property that holds the experiment name
+QUERY_PAGE_SIZE = 100  # Maximum page size of databases.query
+LOOKUP_BATCH_SIZE = 100  # Maximum number of conditions in one compound filter
+
+# Git revision meaning "no previous commit" (e.g. the first push of a branch)
+NULL_REVISION = "0" * 40
+
+# Error handling
+CIRCUIT_BREAKER_THRESHOLD = 3  # Consecutive systemic or retried-out failures before aborting
+MAX_RETRIES = 3  # Retries for transient failures (429, 5xx, timeouts)
+RETRY_BACKOFF_SECONDS = 1.0
+
+# Error classes
+SYSTEMIC = "systemic"    # Auth, missing database, schema mismatch - every row will fail
+TRANSIENT = "transient"  # Rate limits, server errors, timeouts - worth retrying
+ROW = "row"              # Validation problems specific to a single row
+
+# Expected database schema (property name -> Notion property type)
+PROPERTY_TYPES = {
+    "Name": "title",
+    "Station": "select",
+    "Discipline": "rich_text",
+    "Country/Institution": "rich_text",
+    "Timeline Status": "rich_text",
+    "Objectives": "rich_text",
+    "Expected Outcomes": "rich_text",
+    "Principal Investigator": "rich_text",
+    "Mission Module": "rich_text"
+}
+
+
+def validate_config(csv_files: Iterable[str] = (CSV_FILE,)):
     """Validate that required configuration is present."""
     if not NOTION_TOKEN:
         print("Error: NOTION_TOKEN not found in environment variables.")
@@ -41,20 +130,484 @@ def validate_config():
         print("Please set it in a .env file or as an environment variable.")
         sys.exit(1)
     
-    if not os.path.exists(CSV_FILE):
-        print(f"Error: CSV file '{CSV_FILE}' not found.")
-        sys.exit(1)
+    for csv_file in csv_files:
+        if not os.path.exists(csv_file):
+            print(f"Error: CSV file '{csv_file}' not found.")
+            sys.exit(1)
+
+
+class SyncError(Exception):
+    """The sync cannot continue (bad revision, unreachable database, ...)."""
+
+
+class ExperimentRow:
+    """
+    Compact, read-only representation of one CSV row.
+    
+    Uses __slots__ instead of a per-row dict and interns values of
+    low-cardinality columns, so large catalogs share one copy of each
+    station, discipline, institution, etc. Supports the dict-style
+    `row.get(column)` access used throughout the sync code.
+    """
+    
+    __slots__ = CSV_COLUMNS
+    
+    def __init__(self, values: Dict[str, str]):
+        for column in CSV_COLUMNS:
+            value = values.get(column) or ""
+            if column in INTERNED_COLUMNS:
+                value = sys.intern(value)
+            object.__setattr__(self, column, value)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("ExperimentRow is read-only")
+    
+    def __getitem__(self, column: str) -> str:
+        if column not in CSV_COLUMNS:
+            raise KeyError(column)
+        return getattr(self, column)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ExperimentRow):
+            return NotImplemented
+        return self.values() == other.values()
+    
+    def __hash__(self) -> int:
+        return hash(self.values())
+    
+    def __repr__(self) -> str:
+        return f"ExperimentRow({self.Experiment_Name!r})"
+    
+    def __reduce__(self):
+        return (ExperimentRow, (self.to_dict(),))
+    
+    @classmethod
+    def from_values(cls, values: Iterable[str]) -> "ExperimentRow":
+        """Build a row from values in CSV_COLUMNS order, without a dict in between."""
+        values = list(values)
+        for index in _INTERNED_INDEXES:
+            values[index] = sys.intern(values[index])
+        row = object.__new__(cls)
+        for set_slot, value in zip(_SLOT_SETTERS, values):
+            set_slot(row, value)
+        return row
+    
+    def get(self, column: str, default: str = "") -> str:
+        if column not in CSV_COLUMNS:
+            return default
+        return getattr(self, column)
+    
+    def values(self) -> tuple:
+        return tuple(getattr(self, column) for column in CSV_COLUMNS)
+    
+    def to_dict(self) -> Dict[str, str]:
+        return dict(zip(CSV_COLUMNS, self.values()))
+
 
+# Used by ExperimentRow.from_values(): interned positions and slot setters
+_INTERNED_INDEXES = tuple(i for i, column in enumerate(CSV_COLUMNS) if column in INTERNED_COLUMNS)
+_SLOT_SETTERS = tuple(getattr(ExperimentRow, column).__set__ for column in CSV_COLUMNS)
+_NAME_INDEX = CSV_COLUMNS.index("Experiment_Name")
 
-def read_csv_data() -> List[Dict[str, str]]:
+
+def read_csv_data(path: Optional[str] = None) -> List[ExperimentRow]:
     """Read data from the CSV file."""
-    with open(CSV_FILE, 'r', encoding='utf-8') as f:
+    with open(path or CSV_FILE, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
-        return list(reader)
+        return [ExperimentRow(row) for row in reader]
+
+
+def expand_inputs(pattern: str, revisions: Iterable[str] = ()) -> List[str]:
+    """
+    Expand an input argument into CSV file paths.
+    
+    Accepts a single file, a directory (every *.csv file below it) or a
+    glob pattern such as 'catalog/*-2024.csv'. With `revisions` set, the
+    files are listed from git at each of those revisions rather than from
+    the working tree, so a file deleted between them is still included.
+    """
+    revisions = list(revisions)
+    if revisions:
+        paths = set()
+        for revision in revisions:
+            paths.update(list_inputs_at_revision(pattern, revision))
+    elif os.path.isdir(pattern):
+        paths = glob.glob(os.path.join(pattern, "**", "*.csv"), recursive=True)
+    else:
+        paths = glob.glob(pattern, recursive=True)
+    
+    paths = sorted(path for path in paths if revisions or os.path.isfile(path))
+    if not paths:
+        raise SyncError(f"No CSV files match '{pattern}'")
+    return paths
+
+
+def parse_csv_file(path: str) -> Tuple[List[tuple], List[str]]:
+    """
+    Parse and validate one CSV file.
+    
+    Returns a value tuple (in CSV_COLUMNS order) for every row with an
+    experiment name, plus a list of problems found. Runs in a worker
+    process, so it returns plain tuples rather than ExperimentRow objects.
+    Low-cardinality values are interned here too: pickle sends each shared
+    string once, which keeps the result small on its way back to the parent.
+    """
+    rows = []
+    issues = []
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        positions = {column: index for index, column in enumerate(header)}
+        missing = [column for column in CSV_COLUMNS if column not in positions]
+        if missing:
+            return [], [f"{path}: missing columns: {', '.join(missing)}"]
+        
+        indexes = [positions[column] for column in CSV_COLUMNS]
+        width = max(indexes) + 1
+        for record in reader:
+            if not record:
+                continue
+            if len(record) < width:
+                record += [""] * (width - len(record))
+            values = [record[index] for index in indexes]
+            if not values[_NAME_INDEX]:
+                issues.append(f"{path}:{reader.line_num}: row has no Experiment_Name, skipped")
+                continue
+            for index in _INTERNED_INDEXES:
+                values[index] = sys.intern(values[index])
+            rows.append(tuple(values))
+    return rows, issues
+
+
+def parse_csv_files(paths: List[str], workers: int):
+    """
+    Yield (path, parse_csv_file(path)) for each file, in path order.
+    
+    With more than one worker the files are parsed in a process pool, at
+    most one file per worker ahead of the caller. With one worker they are
+    parsed here, which avoids starting a process that can't run in parallel.
+    """
+    if workers <= 1:
+        for path in paths:
+            yield path, parse_csv_file(path)
+        return
+    
+    remaining = iter(paths)
+    # Spawn rather than fork: the sync service calls this from worker threads
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque((path, pool.submit(parse_csv_file, path))
+                        for path in itertools.islice(remaining, workers))
+        while pending:
+            path, future = pending.popleft()
+            result = future.result()
+            del future
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append((next_path, pool.submit(parse_csv_file, next_path)))
+            yield path, result
+            del result
+
+
+def read_csv_files(paths: List[str], workers: Optional[int] = PARSE_WORKERS) -> List[ExperimentRow]:
+    """
+    Read several CSV files into one list of rows keyed by experiment name.
+    
+    Files are parsed and validated by parse_csv_files(), then merged in path
+    order as each file's results arrive. An ExperimentRow is only built for
+    the first row with each name, straight from its value tuple. The same
+    experiment in several places is dropped if the values are identical; if
+    they differ, the sync can't tell which one is right and a SyncError is
+    raised. The values are compared directly rather than through a per-row
+    hash: the first row is kept in memory anyway, the comparison only runs
+    when a name repeats, and it can't be fooled by a hash collision. A single
+    file is read directly with read_csv_data().
+    """
+    if len(paths) == 1:
+        return read_csv_data(paths[0])
+    
+    merged = {}  # experiment name -> (row, path)
+    issues = []
+    conflicts = []
+    
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    for path, (values_list, file_issues) in parse_csv_files(paths, workers):
+        issues.extend(file_issues)
+        for values in values_list:
+            name = values[_NAME_INDEX]
+            first = merged.get(name)
+            if first is None:
+                merged[name] = (ExperimentRow.from_values(values), path)
+            elif first[0].values() == values:
+                issues.append(f"{path}: duplicate of '{name}' from {first[1]}, skipped")
+            else:
+                conflicts.append(f"'{name}' differs between {first[1]} and {path}")
+        del values_list
+    
+    for issue in issues:
+        print(f"⚠️  {issue}")
+    if conflicts:
+        raise SyncError(
+            f"{len(conflicts)} experiment(s) defined differently in several places: "
+            + "; ".join(conflicts[:5])
+        )
+    return [row for row, _ in merged.values()]
+
+
+class CsvDelta(NamedTuple):
+    """Rows that changed between two revisions of the CSV file."""
+    added: List[ExperimentRow]
+    modified: List[ExperimentRow]
+    removed: List[ExperimentRow]
+    
+    def __len__(self) -> int:
+        return len(self.added) + len(self.modified) + len(self.removed)
+
+
+def run_git(*args: str, cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Run a git command and capture its output."""
+    return subprocess.run(
+        ["git", *args], capture_output=True, text=True, encoding='utf-8', cwd=cwd
+    )
+
+
+def repository_root(path: str) -> str:
+    """
+    Return the root of the git repository holding a file, directory or glob.
+    
+    Starts from the nearest existing directory, so a pattern like
+    'data/*/catalog.csv' or a file that no longer exists still resolves.
+    """
+    directory = os.path.abspath(path)
+    while not os.path.isdir(directory):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    result = run_git("rev-parse", "--show-toplevel", cwd=directory)
+    if result.returncode != 0:
+        raise SyncError(f"'{path}' is not inside a git repository")
+    return result.stdout.strip()
 
 
-def create_notion_page_properties(row: Dict[str, str]) -> Dict[str, Any]:
-    """Convert CSV row to Notion page properties."""
+def relative_to_repo(path: str) -> Tuple[str, str]:
+    """
+    Return (repository root, path relative to the root) for a file.
+    
+    `git show REV:PATH` and friends take paths relative to the repository
+    root, so absolute paths and paths relative to another directory have to
+    be translated first.
+    """
+    root = repository_root(os.path.dirname(os.path.abspath(path)))
+    relpath = os.path.relpath(os.path.realpath(path), os.path.realpath(root))
+    return root, relpath.replace(os.sep, "/")
+
+
+def locate_in_repo(path: str, revisions: Iterable[str] = ()) -> Tuple[str, str]:
+    """
+    Like relative_to_repo(), but the file must be tracked by git. A file
+    deleted from the working tree still counts if it exists at one of
+    `revisions`.
+    """
+    root, relpath = relative_to_repo(path)
+    tracked = run_git("ls-files", "--error-unmatch", "--", relpath, cwd=root)
+    if tracked.returncode != 0 and not any(
+        exists_at_revision(root, resolve_revision(revision, root), relpath)
+        for revision in revisions
+    ):
+        raise SyncError(f"'{path}' is not tracked by git")
+    return root, relpath
+
+
+def resolve_revision(revision: str, cwd: Optional[str] = None) -> str:
+    """Resolve a git revision to a commit SHA."""
+    if revision.strip("0") == "":
+        return NULL_REVISION
+    
+    result = run_git("rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}", cwd=cwd)
+    if result.returncode != 0:
+        raise SyncError(
+            f"git revision '{revision}' not found. "
+            "If running in GitHub Actions, check out with 'fetch-depth: 0'."
+        )
+    return result.stdout.strip()
+
+
+def resolve_since(since: str, cwd: Optional[str] = None) -> str:
+    """Return the last commit made before a date like '24 hours ago'."""
+    result = run_git("rev-list", "-1", f"--before={since}", "HEAD", cwd=cwd)
+    if result.returncode != 0:
+        raise SyncError(f"cannot resolve --since '{since}': {result.stderr.strip()}")
+    return result.stdout.strip() or NULL_REVISION
+
+
+def exists_at_revision(root: str, revision: str, relpath: str) -> bool:
+    """Check whether a file exists at a resolved revision."""
+    if revision == NULL_REVISION:
+        return False
+    
+    listing = run_git("ls-tree", "--name-only", revision, "--", relpath, cwd=root)
+    if listing.returncode != 0:
+        raise SyncError(f"git ls-tree failed: {listing.stderr.strip()}")
+    return bool(listing.stdout.strip())
+
+
+def list_inputs_at_revision(pattern: str, revision: str) -> List[str]:
+    """
+    Return the files matching an input argument at a git revision.
+    
+    Uses the same rules as expand_inputs(): the file itself, every *.csv
+    file below a directory, or the files matching a glob.
+    """
+    root = repository_root(pattern)
+    revision = resolve_revision(revision, root)
+    if revision == NULL_REVISION:
+        return []
+    
+    result = run_git("ls-tree", "-r", "-z", "--name-only", revision, cwd=root)
+    if result.returncode != 0:
+        raise SyncError(f"git ls-tree failed: {result.stderr.strip()}")
+    
+    target = os.path.realpath(pattern)
+    paths = []
+    for relpath in result.stdout.split("\0"):
+        if not relpath:
+            continue
+        path = os.path.join(root, *relpath.split("/"))
+        in_directory = path.startswith(target + os.sep) and path.endswith(".csv")
+        if in_directory or fnmatch.fnmatchcase(path, target):
+            paths.append(path)
+    return paths
+
+
+def read_blob(root: str, revision: str, relpath: str) -> Optional[str]:
+    """
+    Return a file's contents at a resolved revision, or None if the file
+    didn't exist there. Any other git failure raises SyncError.
+    """
+    if not exists_at_revision(root, revision, relpath):
+        return None
+    
+    result = run_git("show", f"{revision}:{relpath}", cwd=root)
+    if result.returncode != 0:
+        raise SyncError(f"git show {revision}:{relpath} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def parse_csv_text(text: Optional[str]) -> List[ExperimentRow]:
+    """Parse CSV text (None meaning no file) into rows."""
+    if text is None:
+        return []
+    return [ExperimentRow(row) for row in csv.DictReader(io.StringIO(text))]
+
+
+def read_csv_at_revision(revision: str, path: str = CSV_FILE) -> List[ExperimentRow]:
+    """Read the CSV file as it was at a git revision (empty if it didn't exist)."""
+    root, relpath = locate_in_repo(path, (revision,))
+    return parse_csv_text(read_blob(root, resolve_revision(revision, root), relpath))
+
+
+def compute_delta(old_rows: Iterable[ExperimentRow], new_rows: Iterable[ExperimentRow]) -> CsvDelta:
+    """Compare two sets of rows keyed by experiment name."""
+    old = {row.Experiment_Name: row for row in old_rows if row.Experiment_Name}
+    new = {row.Experiment_Name: row for row in new_rows if row.Experiment_Name}
+    
+    added = [row for name, row in new.items() if name not in old]
+    modified = [row for name, row in new.items() if name in old and old[name] != row]
+    removed = [row for name, row in old.items() if name not in new]
+    return CsvDelta(added, modified, removed)
+
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def is_whole_record(line: str, field_count: int) -> bool:
+    """
+    Check that a line holds exactly one complete CSV record.
+    
+    An odd number of quotes means a quoted field continues onto another
+    line; a wrong field count means the line is the middle of one.
+    """
+    if line.count('"') % 2:
+        return False
+    records = list(csv.reader([line]))
+    return len(records) == 1 and len(records[0]) == field_count
+
+
+def read_csv_delta(before: str, after: str, path: str = CSV_FILE) -> CsvDelta:
+    """
+    Return the rows added, modified or removed between two git revisions.
+    
+    Only the lines in `git diff` are parsed, so a one-line edit costs one
+    row regardless of file size. Falls back to comparing both revisions in
+    full when the diff touches the header line, when the file doesn't exist
+    in one of them, or when the file has quoted fields spanning lines.
+    """
+    root, relpath = locate_in_repo(path, (before, after))
+    before = resolve_revision(before, root)
+    after = resolve_revision(after, root)
+    
+    if before == after:
+        return CsvDelta([], [], [])
+    
+    def full_comparison() -> CsvDelta:
+        return compute_delta(parse_csv_text(read_blob(root, before, relpath)),
+                             parse_csv_text(read_blob(root, after, relpath)))
+    
+    if before == NULL_REVISION:
+        return full_comparison()
+    
+    result = run_git("diff", "--unified=0", "--no-color", "--no-ext-diff",
+                     before, after, "--", relpath, cwd=root)
+    if result.returncode != 0:
+        raise SyncError(f"git diff failed: {result.stderr.strip()}")
+    
+    removed_lines = []
+    added_lines = []
+    for line in result.stdout.splitlines():
+        match = HUNK_HEADER.match(line)
+        if match:
+            old_start, old_count, new_start, new_count = match.groups()
+            touches_header = (
+                (int(old_start) <= 1 and old_count != "0") or
+                (int(new_start) <= 1 and new_count != "0")
+            )
+            if touches_header:
+                return full_comparison()
+        elif line.startswith("-") and not line.startswith("---"):
+            removed_lines.append(line[1:])
+        elif line.startswith("+") and not line.startswith("+++"):
+            added_lines.append(line[1:])
+    
+    if not removed_lines and not added_lines:
+        return CsvDelta([], [], [])
+    
+    after_text = read_blob(root, after, relpath)
+    if not after_text:
+        return full_comparison()
+    after_lines = after_text.splitlines()
+    header = after_lines[0]
+    field_count = len(next(csv.reader([header])))
+    
+    multi_line = (
+        any(line.count('"') % 2 for line in after_lines) or
+        not all(is_whole_record(line, field_count) for line in removed_lines + added_lines)
+    )
+    if multi_line:
+        return full_comparison()
+    
+    old_rows = parse_csv_text("\n".join([header] + removed_lines))
+    new_rows = parse_csv_text("\n".join([header] + added_lines))
+    return compute_delta(old_rows, new_rows)
+
+
+def create_notion_page_properties(row: ExperimentRow) -> Dict[str, Any]:
+    """
+    Convert CSV row to Notion page properties.
+    
+    Payloads are much larger than the rows they come from, so build them
+    right before the API call rather than for all rows up front.
+    """
     properties = {
         "Name": {
             "title": [
@@ -138,6 +691,297 @@ def create_notion_page_properties(row: Dict[str, str]) -> Dict[str, Any]:
     return properties
 
 
+def classify_error(error: Exception) -> str:
+    """Classify a Notion API error as systemic, transient or per-row."""
+    # Timeouts, refused connections, DNS failures, dropped connections
+    if isinstance(error, (RequestTimeoutError, httpx.TransportError)):
+        return TRANSIENT
+    
+    if isinstance(error, APIResponseError):
+        if error.code in (APIErrorCode.Unauthorized,
+                          APIErrorCode.RestrictedResource,
+                          APIErrorCode.ObjectNotFound):
+            return SYSTEMIC
+        if error.code in (APIErrorCode.RateLimited,
+                          APIErrorCode.InternalServerError,
+                          APIErrorCode.ServiceUnavailable,
+                          APIErrorCode.ConflictError):
+            return TRANSIENT
+        if error.code == APIErrorCode.ValidationError:
+            # Errors naming a database property mean the schema doesn't match
+            message = str(error)
+            if "is not a property that exists" in message or "is expected to be" in message:
+                return SYSTEMIC
+            return ROW
+    
+    if isinstance(error, HTTPResponseError):
+        if error.status in (401, 403, 404):
+            return SYSTEMIC
+        if error.status == 429 or error.status >= 500:
+            return TRANSIENT
+    
+    return ROW
+
+
+class CircuitBreaker:
+    """
+    Trip after a number of consecutive failures that will hit every row.
+    
+    Systemic failures count, and so do transient ones: call_with_retry only
+    raises those once its retries are used up, e.g. with no network at all.
+    Per-row errors reset the count. Thread-safe; stays tripped.
+    """
+    
+    def __init__(self, threshold: int = CIRCUIT_BREAKER_THRESHOLD):
+        self.threshold = threshold
+        self.consecutive_failures = 0
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+    
+    def record_success(self):
+        with self._lock:
+            if not self.tripped:
+                self.consecutive_failures = 0
+    
+    def record_failure(self, error: Exception, kind: str):
+        with self._lock:
+            if self.tripped:
+                return
+            if kind in (SYSTEMIC, TRANSIENT):
+                self.consecutive_failures += 1
+                self.last_error = error
+            else:
+                self.consecutive_failures = 0
+    
+    @property
+    def tripped(self) -> bool:
+        return self.consecutive_failures >= self.threshold
+
+
+# Seconds each thread has spent waiting in RateLimiter.acquire(), so that
+# latency measurements can leave out queueing behind the local rate budget
+_limiter_waits = threading.local()
+
+
+def limiter_wait_seconds() -> float:
+    """Total time the current thread has waited for rate limiter slots."""
+    return getattr(_limiter_waits, "total", 0.0)
+
+
+# Guards read-modify-write of SYNC_STATE_FILE by concurrent syncs
+_state_lock = threading.Lock()
+
+
+class ConcurrencyController:
+    """
+    AIMD controller for the number of write requests in flight.
+    
+    Every healthy response raises the limit by 1/limit (about +1 per round
+    of requests); a 429, server error, timeout or latency spike multiplies
+    it by DECREASE_FACTOR, at most once per round. Latency is the HTTP
+    round-trip only; time spent waiting for a RateLimiter slot is left out.
+    The average the limit settles around is saved to SYNC_STATE_FILE, per
+    database, so the next run starts there instead of probing up from one.
+    """
+    
+    def __init__(self, limit: float = MIN_CONCURRENCY):
+        self.limit = min(max(limit, MIN_CONCURRENCY), MAX_CONCURRENCY)
+        self.steady_limit = self.limit  # Moving average of the limit over the run
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self.requests = 0
+        self.started = time.monotonic()
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+    
+    @staticmethod
+    def read_state(path: str) -> Dict[str, Any]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+    
+    @classmethod
+    def load(cls, key: str, path: Optional[str] = None) -> "ConcurrencyController":
+        """Start from the concurrency a previous run learned for `key`, if any."""
+        with _state_lock:
+            entry = cls.read_state(path or SYNC_STATE_FILE).get(key)
+        try:
+            return cls(float(entry["concurrency"]))
+        except (KeyError, TypeError, ValueError):
+            return cls()
+    
+    def save(self, key: str, path: Optional[str] = None):
+        """Persist the learned concurrency for `key`."""
+        if self.requests < MIN_LEARNING_REQUESTS:
+            return
+        path = path or SYNC_STATE_FILE
+        with _state_lock:
+            state = self.read_state(path)
+            state[key] = {
+                "concurrency": round(self.steady_limit, 2),
+                "updated_at": datetime.now().isoformat(timespec="seconds")
+            }
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, path)
+    
+    @property
+    def rate(self) -> float:
+        """Requests per second since the controller was created."""
+        return self.requests / max(time.monotonic() - self.started, 1e-9)
+    
+    @contextmanager
+    def slot(self):
+        """Hold one of the `limit` in-flight slots."""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+    
+    def timed(self, func):
+        """Wrap an API call so each attempt's latency and outcome feed the controller."""
+        def call(*args, **kwargs):
+            started = time.monotonic()
+            waited_before = limiter_wait_seconds()
+            error = None
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                # Leave out time spent queueing for a rate limiter slot
+                waited = limiter_wait_seconds() - waited_before
+                latency = time.monotonic() - started - waited
+                self.record(started + waited, latency, error)
+        return call
+    
+    def record(self, started: float, latency: float, error: Optional[Exception] = None):
+        with self._cond:
+            self.requests += 1
+            congested = error is not None and classify_error(error) == TRANSIENT
+            if error is None and self.baseline_latency is not None:
+                congested = latency > max(self.baseline_latency * LATENCY_SPIKE_FACTOR,
+                                          LATENCY_SPIKE_FLOOR)
+            
+            if congested:
+                # Requests sent before the last decrease saw the old limit
+                if started >= self._last_decrease:
+                    self.limit = max(self.limit * DECREASE_FACTOR, MIN_CONCURRENCY)
+                    self._last_decrease = time.monotonic()
+            elif error is None:
+                self.limit = min(self.limit + 1.0 / self.limit, MAX_CONCURRENCY)
+            self.steady_limit = 0.95 * self.steady_limit + 0.05 * self.limit
+            
+            if error is None:
+                if self.baseline_latency is None:
+                    self.baseline_latency = latency
+                else:
+                    self.baseline_latency = 0.9 * self.baseline_latency + 0.1 * latency
+            self._cond.notify_all()
+
+
+def call_with_retry(func, *args, **kwargs):
+    """Call a Notion API function, retrying transient failures with backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if classify_error(e) != TRANSIENT or attempt == MAX_RETRIES:
+                raise
+            
+            delay = RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            headers = getattr(e, "headers", None)
+            if headers and headers.get("retry-after"):
+                try:
+                    delay = float(headers["retry-after"])
+                except ValueError:
+                    pass
+            time.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Space requests evenly at `rate` per second, shared by all threads.
+    
+    Each caller reserves the next free slot under a lock and sleeps until it,
+    so concurrent callers are served in arrival order.
+    """
+    
+    def __init__(self, rate: float = NOTION_RATE_LIMIT):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+            _limiter_waits.total = limiter_wait_seconds() + (slot - now)
+
+
+class RateLimitedClient(Client):
+    """Notion client that takes a slot from a shared RateLimiter before each request."""
+    
+    def __init__(self, limiter: RateLimiter, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+    
+    def request(self, *args: Any, **kwargs: Any) -> Any:
+        self.limiter.acquire()
+        return super().request(*args, **kwargs)
+
+
+def probe_database(notion: Client, database_id: str) -> List[str]:
+    """
+    Cheaply check that the database is reachable and has the expected schema.
+    
+    Returns a list of problems; an empty list means the write phase can start.
+    """
+    try:
+        database = call_with_retry(notion.databases.retrieve, database_id=database_id)
+    except Exception as e:
+        return [f"Cannot access database ({classify_error(e)}): {e}"]
+    
+    properties = database.get("properties", {})
+    issues = []
+    for prop_name, expected_type in PROPERTY_TYPES.items():
+        if prop_name not in properties:
+            issues.append(f"Missing property: {prop_name}")
+        elif properties[prop_name].get("type") != expected_type:
+            issues.append(
+                f"Property '{prop_name}' has wrong type: "
+                f"expected '{expected_type}', got '{properties[prop_name].get('type')}'"
+            )
+    return issues
+
+
+def print_common_issues():
+    """Print hints for the usual causes of a failed sync."""
+    print("\nCommon issues:")
+    print("1. Database not shared with integration")
+    print("   → Open database in Notion → Click '...' → 'Add connections' → Select integration")
+    print("\n2. Property type mismatch")
+    print("   → Ensure 'Station' property is type 'Select' (not 'Text')")
+    print("   → Ensure 'Station' has options: 'Tiangong' and 'ISS'")
+    print("\n3. Invalid database ID or token")
+    print("   → Verify NOTION_DATABASE_ID in secrets")
+    print("   → Verify NOTION_TOKEN is valid and not expired")
+
+
 def get_existing_pages(notion: Client, database_id: str) -> Dict[str, str]:
     """Get all existing pages from the Notion database."""
     existing_pages = {}
@@ -145,11 +989,11 @@ def get_existing_pages(notion: Client, database_id: str) -> Dict[str, str]:
     start_cursor = None
     
     while has_more:
-        params = {"database_id": database_id}
+        params = {"database_id": database_id, "page_size": QUERY_PAGE_SIZE}
         if start_cursor:
             params["start_cursor"] = start_cursor
         
-        response = notion.databases.query(**params)
+        response = call_with_retry(notion.databases.query, **params)
         
         for page in response["results"]:
             # Use experiment name as key
@@ -164,85 +1008,368 @@ def get_existing_pages(notion: Client, database_id: str) -> Dict[str, str]:
     return existing_pages
 
 
-def sync_to_notion():
-    """Main sync function."""
-    validate_config()
+def find_existing_pages(notion: Client, database_id: str, keys: Iterable[str]) -> Dict[str, str]:
+    """Look up pages by experiment name, batching many names per query."""
+    keys = sorted(set(keys))
+    existing_pages = {}
     
-    print("Starting sync to Notion...")
-    print(f"CSV file: {CSV_FILE}")
-    print(f"Database ID: {NOTION_DATABASE_ID}")
+    for i in range(0, len(keys), LOOKUP_BATCH_SIZE):
+        batch = keys[i:i + LOOKUP_BATCH_SIZE]
+        params = {
+            "database_id": database_id,
+            "filter": {
+                "or": [
+                    {"property": KEY_PROPERTY, "title": {"equals": key}}
+                    for key in batch
+                ]
+            },
+            "page_size": QUERY_PAGE_SIZE
+        }
+        has_more = True
+        
+        while has_more:
+            response = call_with_retry(notion.databases.query, **params)
+            
+            for page in response["results"]:
+                title_property = page["properties"].get(KEY_PROPERTY, {})
+                if title_property.get("title") and len(title_property["title"]) > 0:
+                    name = title_property["title"][0]["text"]["content"]
+                    existing_pages[name] = page["id"]
+            
+            has_more = response["has_more"]
+            params["start_cursor"] = response.get("next_cursor")
+    
+    return existing_pages
+
+
+def estimate_database_size(paths: Iterable[str] = (CSV_FILE,)) -> int:
+    """
+    Estimate the number of pages in the database from the CSV files it mirrors.
+    
+    This is a lower bound: the database may also hold stale or hand-made
+    pages, or rows from other files synced into the same database.
+    """
+    size = 0
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                size += max(sum(1 for _ in f) - 1, 0)
+    return size
+
+
+def choose_lookup_strategy(key_count: int, database_size: int) -> str:
+    """
+    Pick "lookup" (filtered queries by key) or "scan" (page through everything).
+    
+    Each strategy costs one request per batch: LOOKUP_BATCH_SIZE keys per
+    filtered query versus QUERY_PAGE_SIZE pages per scan request. The lookup
+    cost is exact, while `database_size` is only a lower bound on what a
+    scan has to read, so ties go to the lookup.
+    """
+    lookup_requests = math.ceil(key_count / LOOKUP_BATCH_SIZE)
+    scan_requests = max(math.ceil(database_size / QUERY_PAGE_SIZE), 1)
+    return "lookup" if lookup_requests <= scan_requests else "scan"
+
+
+def resolve_existing_pages(notion: Client, database_id: str, keys: List[str],
+                           database_size: Optional[int] = None) -> Dict[str, str]:
+    """Find page IDs for the given keys using the cheaper lookup strategy."""
+    if database_size is None:
+        database_size = estimate_database_size()
+    
+    if choose_lookup_strategy(len(keys), database_size) == "lookup":
+        print(f"Looking up {len(keys)} pages by name in Notion...")
+        return find_existing_pages(notion, database_id, keys)
+    
+    print(f"Fetching existing pages from Notion (at least {database_size} pages)...")
+    return get_existing_pages(notion, database_id)
+
+
+def write_page(notion: Client, database_id: str, row: ExperimentRow,
+               page_id: Optional[str], archive: bool, timed=lambda func: func) -> str:
+    """Create, update or archive one page. Returns which of the three it did."""
+    if archive:
+        call_with_retry(timed(notion.pages.update), page_id=page_id, archived=True)
+        return "archived"
+    
+    properties = create_notion_page_properties(row)
+    if page_id:
+        # Update existing page
+        call_with_retry(timed(notion.pages.update), page_id=page_id, properties=properties)
+        return "updated"
+    
+    # Create new page
+    call_with_retry(
+        timed(notion.pages.create),
+        parent={"database_id": database_id},
+        properties=properties
+    )
+    return "created"
+
+
+def write_changes(notion: Client,
+                  database_id: str,
+                  rows: List[ExperimentRow],
+                  removed_rows: Iterable[ExperimentRow] = (),
+                  probe: bool = True,
+                  database_size: Optional[int] = None,
+                  state_file: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Create or update a page per row and archive pages of removed rows.
     
-    # Initialize Notion client
-    notion = Client(auth=NOTION_TOKEN)
+    Writes run on a thread pool, with the number in flight set by a
+    ConcurrencyController whose learned limit is kept in `state_file`
+    under this database's ID.
+    Returns the created/updated/archived counts and per-row error messages.
+    Raises SyncError if the database probe fails or the circuit breaker trips.
+    """
+    removed_rows = list(removed_rows)
     
-    # Read CSV data
-    csv_data = read_csv_data()
-    print(f"Found {len(csv_data)} experiments in CSV")
+    # Probe the database before doing any work
+    if probe:
+        print("Checking database access and schema...")
+        issues = probe_database(notion, database_id)
+        if issues:
+            raise SyncError("Database check failed: " + "; ".join(issues))
     
     # Get existing pages
-    print("Fetching existing pages from Notion...")
-    existing_pages = get_existing_pages(notion, NOTION_DATABASE_ID)
+    keys = [row.Experiment_Name for row in rows + removed_rows if row.Experiment_Name]
+    existing_pages = resolve_existing_pages(notion, database_id, keys, database_size)
     print(f"Found {len(existing_pages)} existing pages in Notion")
     
     # Sync each row
-    created_count = 0
-    updated_count = 0
-    error_count = 0
-    errors = []
-    
-    for row in csv_data:
-        experiment_name = row.get("Experiment_Name", "")
-        if not experiment_name:
-            continue
-        
-        properties = create_notion_page_properties(row)
-        
-        if experiment_name in existing_pages:
-            # Update existing page
-            page_id = existing_pages[experiment_name]
-            try:
-                notion.pages.update(page_id=page_id, properties=properties)
-                updated_count += 1
-                print(f"✓ Updated: {experiment_name}")
-            except Exception as e:
-                error_count += 1
-                error_msg = f"Error updating {experiment_name}: {e}"
-                errors.append(error_msg)
-                print(f"✗ {error_msg}")
-        else:
-            # Create new page
+    result = {"created": 0, "updated": 0, "archived": 0, "errors": []}
+    breaker = CircuitBreaker()
+    controller = ConcurrencyController.load(database_id, state_file)
+    messages = {"created": "+ Created", "updated": "✓ Updated", "archived": "- Archived"}
+    
+    def run(row: ExperimentRow, page_id: Optional[str], archive: bool, action: str):
+        with controller.slot():
+            # Checked while holding the slot, so no request starts after a trip
+            if breaker.tripped:
+                return row, None, None
             try:
-                notion.pages.create(
-                    parent={"database_id": NOTION_DATABASE_ID},
-                    properties=properties
-                )
-                created_count += 1
-                print(f"+ Created: {experiment_name}")
+                outcome = write_page(notion, database_id, row, page_id, archive, controller.timed)
             except Exception as e:
-                error_count += 1
-                error_msg = f"Error creating {experiment_name}: {e}"
-                errors.append(error_msg)
+                kind = classify_error(e)
+                breaker.record_failure(e, kind)
+                return row, None, f"Error {action} {row.Experiment_Name} ({kind}): {e}"
+            breaker.record_success()
+            return row, outcome, None
+    
+    def collect(futures):
+        for future in futures:
+            row, outcome, error_msg = future.result()
+            if outcome:
+                result[outcome] += 1
+                print(f"{messages[outcome]}: {row.Experiment_Name}")
+            elif error_msg:
+                result["errors"].append(error_msg)
                 print(f"✗ {error_msg}")
     
+    operations = [(row, False) for row in rows] + [(row, True) for row in removed_rows]
+    
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as pool:
+        pending = set()
+        for row, archive in operations:
+            experiment_name = row.get("Experiment_Name", "")
+            if not experiment_name:
+                continue
+            
+            page_id = existing_pages.get(experiment_name)
+            if archive:
+                if not page_id:
+                    continue
+                action = "archiving"
+            elif page_id:
+                action = "updating"
+            else:
+                action = "creating"
+            
+            pending.add(pool.submit(run, row, page_id, archive, action))
+            
+            # Keep a bounded number of writes queued rather than one per row
+            if len(pending) >= 2 * MAX_CONCURRENCY:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            if breaker.tripped:
+                break
+        
+        collect(wait(pending)[0])
+    
+    controller.save(database_id, state_file)
+    print(f"Write concurrency: {controller.steady_limit:.1f} "
+          f"({controller.requests} requests, {controller.rate:.1f}/s)")
+    
+    if breaker.tripped:
+        raise SyncError(
+            f"Aborting: {breaker.consecutive_failures} consecutive systemic or persistent failures. "
+            f"Last error: {breaker.last_error}"
+        )
+    
+    return result
+
+
+def merge_deltas(deltas: Iterable[CsvDelta]) -> CsvDelta:
+    """
+    Combine per-file deltas.
+    
+    A row removed from one file and added to another has moved: it is
+    modified if its values changed and left alone otherwise. The same
+    experiment added or modified in several files must have identical
+    values, as in read_csv_files(); otherwise a SyncError is raised.
+    """
+    added = {}
+    modified = {}
+    removed = {}
+    conflicts = []
+    for delta in deltas:
+        for changed, rows in ((added, delta.added), (modified, delta.modified)):
+            for row in rows:
+                name = row.Experiment_Name
+                other = added.get(name) or modified.get(name)
+                if other is None:
+                    changed[name] = row
+                elif other != row:
+                    conflicts.append(f"'{name}'")
+        removed.update((row.Experiment_Name, row) for row in delta.removed)
+    
+    if conflicts:
+        raise SyncError(
+            f"{len(conflicts)} experiment(s) changed differently in several files: "
+            + ", ".join(conflicts[:5])
+        )
+    
+    for name in list(added):
+        if name in removed:
+            old = removed.pop(name)
+            row = added.pop(name)
+            if row != old:
+                modified[name] = row
+    for name in list(removed):
+        if name in modified:
+            del removed[name]
+    
+    return CsvDelta(list(added.values()), list(modified.values()), list(removed.values()))
+
+
+def read_keys_at_revision(path: str, revision: str) -> set:
+    """Return the experiment names in a CSV file at a git revision (none if it didn't exist)."""
+    root, relpath = relative_to_repo(path)
+    text = read_blob(root, resolve_revision(revision, root), relpath)
+    if text is None:
+        return set()
+    return {row.get("Experiment_Name") for row in csv.DictReader(io.StringIO(text))} - {"", None}
+
+
+def load_changes(csv_files: Optional[List[str]] = None,
+                 before: Optional[str] = None,
+                 after: str = "HEAD") -> CsvDelta:
+    """
+    Load the rows to sync: every row of the CSV files, or with `before` set,
+    only the rows changed between the `before` and `after` git revisions.
+    
+    In delta mode, `csv_files` should come from expand_inputs() with both
+    revisions, so files deleted in between are diffed (and their rows
+    archived) too.
+    """
+    if csv_files is None:
+        csv_files = [CSV_FILE]
+    
+    if before is None:
+        rows = read_csv_files(csv_files)
+        print(f"Found {len(rows)} experiments in {len(csv_files)} CSV file(s)")
+        return CsvDelta(rows, [], [])
+    
+    print(f"Revisions: {before}..{after}")
+    delta = merge_deltas(read_csv_delta(before, after, path) for path in csv_files)
+    
+    # A row removed from one file may still be defined in another one
+    if delta.removed and len(csv_files) > 1:
+        remaining = set()
+        for path in csv_files:
+            remaining |= read_keys_at_revision(path, after)
+        still_defined = [row for row in delta.removed if row.Experiment_Name in remaining]
+        if still_defined:
+            print(f"{len(still_defined)} removed experiment(s) are still defined in other files")
+            delta = CsvDelta(delta.added, delta.modified,
+                             [row for row in delta.removed if row.Experiment_Name not in remaining])
+    
+    print(f"Changes: {len(delta.added)} added, {len(delta.modified)} modified, "
+          f"{len(delta.removed)} removed")
+    return delta
+
+
+def sync_to_notion(notion: Optional[Client] = None,
+                   before: Optional[str] = None,
+                   after: str = "HEAD",
+                   inputs: str = CSV_FILE):
+    """
+    Main sync function.
+    
+    `inputs` is a CSV file, a directory of CSV files or a glob pattern.
+    With `before` set, only rows changed between the `before` and `after`
+    git revisions are synced, and pages for removed rows are archived.
+    """
+    # In delta mode the files come from git, including ones deleted since `before`
+    revisions = (before, after) if before is not None else ()
+    try:
+        csv_files = expand_inputs(inputs, revisions)
+    except SyncError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    validate_config(csv_files if before is None else ())
+    
+    print("Starting sync to Notion...")
+    if len(csv_files) == 1:
+        print(f"CSV file: {csv_files[0]}")
+    else:
+        print(f"CSV files: {len(csv_files)} matching '{inputs}'")
+    print(f"Database ID: {NOTION_DATABASE_ID}")
+    
+    try:
+        # Read CSV data
+        delta = load_changes(csv_files, before, after)
+        if before is not None and len(delta) == 0:
+            print("Nothing to sync.")
+            return
+        
+        # Initialize Notion client
+        if notion is None:
+            notion = Client(auth=NOTION_TOKEN)
+        
+        # Small deltas skip the probe: the circuit breaker already bounds
+        # how many calls a dead run can make.
+        result = write_changes(
+            notion,
+            NOTION_DATABASE_ID,
+            delta.added + delta.modified,
+            delta.removed,
+            probe=before is None or len(delta) > CIRCUIT_BREAKER_THRESHOLD,
+            database_size=estimate_database_size(csv_files)
+        )
+    except SyncError as e:
+        print(f"\n❌ {e}")
+        print_common_issues()
+        sys.exit(1)
+    
+    errors = result["errors"]
+    error_count = len(errors)
+    
     print("\n" + "="*60)
     print(f"Sync complete!")
-    print(f"Created: {created_count} pages")
-    print(f"Updated: {updated_count} pages")
+    print(f"Created: {result['created']} pages")
+    print(f"Updated: {result['updated']} pages")
+    if delta.removed:
+        print(f"Archived: {result['archived']} pages")
     print(f"Errors: {error_count}")
     print("="*60)
     
     # If all operations failed, show common issues and exit with error
-    if created_count == 0 and updated_count == 0 and len(csv_data) > 0:
+    if result["created"] == 0 and result["updated"] == 0 and result["archived"] == 0 and error_count > 0:
         print("\n⚠️  WARNING: No pages were created or updated!")
-        print("\nCommon issues:")
-        print("1. Database not shared with integration")
-        print("   → Open database in Notion → Click '...' → 'Add connections' → Select integration")
-        print("\n2. Property type mismatch")
-        print("   → Ensure 'Station' property is type 'Select' (not 'Text')")
-        print("   → Ensure 'Station' has options: 'Tiangong' and 'ISS'")
-        print("\n3. Invalid database ID or token")
-        print("   → Verify NOTION_DATABASE_ID in secrets")
-        print("   → Verify NOTION_TOKEN is valid and not expired")
+        print_common_issues()
         
         if errors:
             print("\nFirst few errors:")
@@ -260,5 +1387,37 @@ def sync_to_notion():
                 print(f"  • {error}")
 
 
+def main():
+    """Parse command-line arguments and run the sync."""
+    parser = argparse.ArgumentParser(description="Sync the research CSV to a Notion database.")
+    parser.add_argument(
+        "--input", default=CSV_FILE,
+        help=f"CSV file, directory of CSV files or glob pattern to sync (default: {CSV_FILE})"
+    )
+    parser.add_argument(
+        "--before",
+        help="sync only rows changed since this git revision (e.g. the push's before SHA)"
+    )
+    parser.add_argument(
+        "--after", default="HEAD",
+        help="git revision to sync up to when using --before/--since (default: HEAD)"
+    )
+    parser.add_argument(
+        "--since",
+        help="like --before, using the last commit before a date such as '24 hours ago'"
+    )
+    args = parser.parse_args()
+    
+    before = args.before
+    if args.since:
+        try:
+            before = resolve_since(args.since, repository_root(args.input))
+        except SyncError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    
+    sync_to_notion(before=before, after=args.after, inputs=args.input)
+
+
 if __name__ == "__main__":
-    sync_to_notion()
+    main()
@@ -5,8 +5,176 @@ This runs without connecting to Notion.
 """
 
 import csv
+import json
+import os
+import shutil
+import subprocess
 import sys
-from sync_to_notion import read_csv_data, create_notion_page_properties
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import httpx
+from notion_client.errors import APIErrorCode, APIResponseError, RequestTimeoutError
+
+import sync_service
+import sync_to_notion
+from sync_to_notion import (
+    read_csv_data,
+    create_notion_page_properties,
+    classify_error,
+    CircuitBreaker,
+    SYSTEMIC,
+    TRANSIENT,
+    ROW,
+)
+
+
+class NotionStandIn(BaseHTTPRequestHandler):
+    """
+    Local HTTP stand-in for the Notion API endpoints the sync uses.
+    
+    Pages are kept per database on the server (`server.databases`), and the
+    time of every request is recorded per token (`server.requests`).
+    """
+    
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _handle(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        token = self.headers.get("Authorization", "").replace("Bearer ", "")
+        parts = self.path.split("?")[0].strip("/").split("/")[1:]
+        
+        with server.lock:
+            server.requests.setdefault(token, []).append(time.monotonic())
+            
+            if parts[0] == "databases" and self.command == "GET":
+                schema = {name: {"type": prop_type}
+                          for name, prop_type in sync_to_notion.PROPERTY_TYPES.items()}
+                return self._send(200, {"object": "database", "properties": schema})
+            
+            if parts[0] == "databases" and parts[2:] == ["query"]:
+                pages = server.databases.setdefault(parts[1], {})
+                results = [
+                    {"id": page_id, "properties": {"Name": {"title": [{"text": {"content": name}}]}}}
+                    for name, page_id in pages.items()
+                ]
+                return self._send(200, {"results": results, "has_more": False, "next_cursor": None})
+            
+            if parts == ["pages"] and self.command == "POST":
+                pages = server.databases.setdefault(body["parent"]["database_id"], {})
+                name = body["properties"]["Name"]["title"][0]["text"]["content"]
+                page_id = f"page-{sum(len(p) for p in server.databases.values())}"
+                pages[name] = page_id
+                return self._send(200, {"object": "page", "id": page_id})
+            
+            if parts[0] == "pages" and self.command == "PATCH":
+                return self._send(200, {"object": "page", "id": parts[1]})
+        
+        self._send(404, {"object": "error", "code": "object_not_found", "message": "not found"})
+    
+    do_GET = do_POST = do_PATCH = _handle
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(server):
+    """Serve on a background thread and return the server's base URL."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def start_notion_stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), NotionStandIn)
+    server.lock = threading.Lock()
+    server.databases = {}
+    server.requests = {}
+    return server, start_server(server)
+
+
+# Keep the learned write concurrency of test runs out of the working tree
+sync_to_notion.SYNC_STATE_FILE = os.path.join(tempfile.mkdtemp(), "sync_state.json")
+
+
+def api_error(status, code, message="error", headers=None):
+    """Build a Notion API error like the client raises."""
+    return APIResponseError(httpx.Response(status, headers=headers), message, code)
+
+
+class FakeEndpoint:
+    """Records calls and answers them with a handler function."""
+    
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+    
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.handler(**kwargs)
+
+
+class FakeNotion:
+    """Minimal local stand-in for notion_client.Client."""
+    
+    def __init__(self, schema=None, existing=None, error=None):
+        self.schema = schema if schema is not None else {
+            name: {"type": prop_type}
+            for name, prop_type in sync_to_notion.PROPERTY_TYPES.items()
+        }
+        self.existing = dict(existing or {})
+        self.error = error
+        self.databases = SimpleNamespace(
+            retrieve=FakeEndpoint(self._retrieve),
+            query=FakeEndpoint(self._query),
+        )
+        self.pages = SimpleNamespace(
+            create=FakeEndpoint(self._create),
+            update=FakeEndpoint(self._update),
+        )
+    
+    def write_calls(self):
+        return len(self.pages.create.calls) + len(self.pages.update.calls)
+    
+    def _retrieve(self, database_id):
+        return {"properties": self.schema}
+    
+    def _query(self, database_id, filter=None, start_cursor=None, page_size=100):
+        names = list(self.existing)
+        if filter is not None:
+            wanted = {condition["title"]["equals"] for condition in filter["or"]}
+            names = [name for name in names if name in wanted]
+        
+        start = int(start_cursor or 0)
+        end = start + page_size
+        results = [
+            {"id": self.existing[name], "properties": {"Name": {"title": [{"text": {"content": name}}]}}}
+            for name in names[start:end]
+        ]
+        has_more = end < len(names)
+        return {"results": results, "has_more": has_more, "next_cursor": str(end) if has_more else None}
+    
+    def _create(self, parent, properties):
+        if self.error is not None:
+            raise self.error
+        return {"id": "new"}
+    
+    def _update(self, page_id, properties):
+        if self.error is not None:
+            raise self.error
+        return {"id": page_id}
 
 def test_csv_parsing():
     """Test that CSV can be read and parsed correctly."""
@@ -91,6 +259,513 @@ def test_csv_completeness():
         print(f"✗ Error checking CSV: {e}")
         return False
 
+def test_compact_rows():
+    """Test that rows are compact and share repeated values."""
+    print("\nTesting compact row representation...")
+    
+    try:
+        data = read_csv_data()
+        first, second = data[0], data[1]
+        
+        assert not hasattr(first, "__dict__"), "rows should not carry a per-row dict"
+        assert first.Station is second.Station, "Station values should be interned"
+        assert first.get("Experiment_Name") == first["Experiment_Name"]
+        assert first.get("Unknown_Column", "N/A") == "N/A"
+        assert set(first.to_dict()) == set(sync_to_notion.CSV_COLUMNS)
+        
+        print("✓ Rows are slotted and low-cardinality values are interned")
+        return True
+    except Exception as e:
+        print(f"✗ Compact rows failed: {e}")
+        return False
+
+
+def test_error_classification():
+    """Test that Notion errors are classified as systemic, transient or per-row."""
+    print("\nTesting error classification...")
+    
+    try:
+        assert classify_error(api_error(401, APIErrorCode.Unauthorized)) == SYSTEMIC
+        assert classify_error(api_error(404, APIErrorCode.ObjectNotFound)) == SYSTEMIC
+        assert classify_error(api_error(429, APIErrorCode.RateLimited)) == TRANSIENT
+        assert classify_error(api_error(503, APIErrorCode.ServiceUnavailable)) == TRANSIENT
+        assert classify_error(RequestTimeoutError()) == TRANSIENT
+        assert classify_error(httpx.ConnectError("Name or service not known")) == TRANSIENT
+        assert classify_error(api_error(
+            400, APIErrorCode.ValidationError, "Station is expected to be select.")) == SYSTEMIC
+        assert classify_error(api_error(
+            400, APIErrorCode.ValidationError, "body.properties.Name.title[0].text.content.length should be ≤ 2000")) == ROW
+        
+        print("✓ Errors classified correctly")
+        return True
+    except Exception as e:
+        print(f"✗ Error classification failed: {e}")
+        return False
+
+
+def test_circuit_breaker():
+    """Test that the sync aborts quickly when every write fails systemically."""
+    print("\nTesting circuit breaker...")
+    
+    try:
+        breaker = CircuitBreaker(threshold=3)
+        breaker.record_failure(Exception(), SYSTEMIC)
+        breaker.record_failure(Exception(), ROW)
+        breaker.record_failure(Exception(), SYSTEMIC)
+        breaker.record_failure(Exception(), SYSTEMIC)
+        assert not breaker.tripped, "per-row errors should reset the breaker"
+        breaker.record_failure(Exception(), SYSTEMIC)
+        assert breaker.tripped
+        
+        breaker = CircuitBreaker(threshold=3)
+        for _ in range(3):
+            breaker.record_failure(Exception(), TRANSIENT)
+        assert breaker.tripped, "retried-out transient errors should trip the breaker"
+        
+        notion = FakeNotion(error=api_error(401, APIErrorCode.Unauthorized))
+        try:
+            sync_to_notion.sync_to_notion(notion)
+            print("✗ Sync did not abort")
+            return False
+        except SystemExit:
+            pass
+        assert notion.write_calls() == sync_to_notion.CIRCUIT_BREAKER_THRESHOLD, \
+            f"expected abort after {sync_to_notion.CIRCUIT_BREAKER_THRESHOLD} writes, got {notion.write_calls()}"
+        
+        # With no network, every attempt fails to connect
+        notion = FakeNotion(error=httpx.ConnectError("Name or service not known"))
+        rows = [sync_to_notion.ExperimentRow({"Experiment_Name": f"Experiment {i}"}) for i in range(50)]
+        backoff = sync_to_notion.RETRY_BACKOFF_SECONDS
+        sync_to_notion.RETRY_BACKOFF_SECONDS = 0
+        try:
+            sync_to_notion.write_changes(notion, "db", rows, probe=False, database_size=0)
+            print("✗ Sync without network did not abort")
+            return False
+        except sync_to_notion.SyncError:
+            pass
+        finally:
+            sync_to_notion.RETRY_BACKOFF_SECONDS = backoff
+        attempts = (sync_to_notion.MAX_RETRIES + 1) * sync_to_notion.CIRCUIT_BREAKER_THRESHOLD
+        assert notion.write_calls() == attempts, \
+            f"expected {attempts} attempts without network, got {notion.write_calls()}"
+        
+        print(f"✓ Sync aborted after {sync_to_notion.CIRCUIT_BREAKER_THRESHOLD} failed writes")
+        return True
+    except Exception as e:
+        print(f"✗ Circuit breaker failed: {e}")
+        return False
+
+
+def test_database_probe():
+    """Test that a schema mismatch is caught before any writes."""
+    print("\nTesting database probe...")
+    
+    try:
+        schema = {name: {"type": prop_type} for name, prop_type in sync_to_notion.PROPERTY_TYPES.items()}
+        schema["Station"] = {"type": "rich_text"}
+        notion = FakeNotion(schema=schema)
+        
+        issues = sync_to_notion.probe_database(notion, "db")
+        assert len(issues) == 1 and "Station" in issues[0], issues
+        
+        try:
+            sync_to_notion.sync_to_notion(notion)
+            print("✗ Sync did not abort")
+            return False
+        except SystemExit:
+            pass
+        assert notion.write_calls() == 0
+        
+        print("✓ Schema mismatch detected before write phase")
+        return True
+    except Exception as e:
+        print(f"✗ Database probe failed: {e}")
+        return False
+
+
+def test_targeted_lookup():
+    """Test that small changes look pages up by key instead of scanning."""
+    print("\nTesting targeted page lookup...")
+    
+    try:
+        choose = sync_to_notion.choose_lookup_strategy
+        assert choose(1, 50_000) == "lookup"
+        assert choose(150, 50_000) == "lookup"
+        assert choose(67, 67) == "lookup"
+        assert choose(5_000, 5_000) == "lookup"
+        assert choose(5_001, 5_000) == "scan"
+        assert choose(50_000, 5_000) == "scan"
+        
+        existing = {f"Experiment {i}": f"page-{i}" for i in range(1_000)}
+        notion = FakeNotion(existing=existing)
+        keys = ["Experiment 3", "Experiment 998", "Not In Notion"]
+        found = sync_to_notion.resolve_existing_pages(notion, "db", keys, database_size=len(existing))
+        assert found == {"Experiment 3": "page-3", "Experiment 998": "page-998"}, found
+        assert len(notion.databases.query.calls) == 1, notion.databases.query.calls
+        
+        notion = FakeNotion(existing=existing)
+        found = sync_to_notion.resolve_existing_pages(notion, "db", list(existing), database_size=500)
+        assert found == existing
+        assert len(notion.databases.query.calls) == 10, len(notion.databases.query.calls)
+        assert all("filter" not in call for call in notion.databases.query.calls)
+        
+        # The database holds far more pages than the CSV: one edit is still one query
+        existing = {f"Experiment {i}": f"page-{i}" for i in range(5_067)}
+        notion = FakeNotion(existing=existing)
+        found = sync_to_notion.resolve_existing_pages(notion, "db", ["Experiment 42"], database_size=67)
+        assert found == {"Experiment 42": "page-42"}, found
+        assert len(notion.databases.query.calls) == 1, len(notion.databases.query.calls)
+        
+        print("✓ Lookup strategy chosen by cost; small changes need one query")
+        return True
+    except Exception as e:
+        print(f"✗ Targeted lookup failed: {e}")
+        return False
+
+
+def test_sync_service():
+    """Test that service jobs sharing a token stay within one rate budget."""
+    print("\nTesting sync service...")
+    
+    rate = 20.0
+    notion_server, notion_url = start_notion_stand_in()
+    service = sync_service.SyncService(workers=3, rate=rate, notion_url=notion_url)
+    service.start()
+    api_server = sync_service.create_server(service, port=0)
+    api_url = start_server(api_server)
+    tmp = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(tmp, "catalog.csv")
+        with open(sync_to_notion.CSV_FILE, 'r', encoding='utf-8') as f:
+            lines = f.readlines()[:6]
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        
+        def post(spec):
+            request = urllib.request.Request(
+                f"{api_url}/jobs", data=json.dumps(spec).encode("utf-8"),
+                headers={"Content-Type": "application/json"}, method="POST")
+            with urllib.request.urlopen(request) as response:
+                return json.load(response)
+        
+        job_ids = [
+            post({"csv_path": csv_path, "database_id": f"db-{i}", "token": "shared-token"})["id"]
+            for i in range(3)
+        ]
+        
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            with urllib.request.urlopen(f"{api_url}/jobs") as response:
+                jobs = json.load(response)
+            if all(job["status"] in ("succeeded", "failed") for job in jobs):
+                break
+            time.sleep(0.05)
+        
+        for job_id in job_ids:
+            with urllib.request.urlopen(f"{api_url}/jobs/{job_id}") as response:
+                job = json.load(response)
+            assert job["status"] == "succeeded", job
+            assert job["result"]["created"] == 5, job
+            assert "token" not in job
+        
+        times = notion_server.requests["shared-token"]
+        # 3 jobs x (probe + scan + 5 creates), spaced at least 1/rate apart
+        assert len(times) == 21, len(times)
+        elapsed = max(times) - min(times)
+        assert elapsed >= (len(times) - 1) / rate * 0.9, f"{len(times)} requests in {elapsed:.2f}s"
+        
+        try:
+            post({"csv_path": os.path.join(tmp, "missing.csv")})
+            print("✗ Invalid job was accepted")
+            return False
+        except urllib.error.HTTPError as e:
+            assert e.code == 400, e.code
+        
+        print(f"✓ 3 jobs completed; {len(times)} requests took {elapsed:.2f}s at {rate:.0f}/s")
+        return True
+    except Exception as e:
+        print(f"✗ Sync service failed: {e}")
+        return False
+    finally:
+        api_server.shutdown()
+        service.stop()
+        notion_server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_multi_file_ingestion():
+    """Test that sharded CSV files are merged with duplicate detection."""
+    print("\nTesting multi-file ingestion...")
+    
+    tmp = tempfile.mkdtemp()
+    try:
+        with open(sync_to_notion.CSV_FILE, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        header, rows = lines[0], lines[1:]
+        
+        # Three shards, one nested; the last shard repeats a row from the first
+        os.makedirs(os.path.join(tmp, "iss"))
+        shards = [
+            ("tiangong-2023.csv", rows[:20]),
+            ("tiangong-2024.csv", rows[20:40]),
+            (os.path.join("iss", "iss.csv"), rows[40:] + rows[:1]),
+        ]
+        for name, shard in shards:
+            with open(os.path.join(tmp, name), 'w', encoding='utf-8') as f:
+                f.writelines([header] + shard)
+        
+        paths = sync_to_notion.expand_inputs(tmp)
+        assert len(paths) == 3, paths
+        assert sync_to_notion.expand_inputs(os.path.join(tmp, "tiangong-*.csv")) == paths[1:], paths
+        
+        merged = sync_to_notion.read_csv_files(paths, workers=2)
+        by_name = lambda row: row.Experiment_Name
+        assert sorted(merged, key=by_name) == sorted(read_csv_data(), key=by_name)
+        assert sync_to_notion.read_csv_files(paths, workers=1) == merged
+        
+        # A conflicting definition of the same experiment stops the sync
+        with open(os.path.join(tmp, "conflict.csv"), 'w', encoding='utf-8') as f:
+            f.writelines([header, rows[0].replace(",CAS,", ",NASA,", 1)])
+        try:
+            sync_to_notion.read_csv_files(sync_to_notion.expand_inputs(tmp), workers=2)
+            print("✗ Conflicting duplicate was not detected")
+            return False
+        except sync_to_notion.SyncError as e:
+            assert "differs" in str(e), e
+        
+        # A row moved unchanged between files needs no write at all
+        old_row, new_row = merged[0], merged[1]
+        delta = sync_to_notion.merge_deltas([
+            sync_to_notion.CsvDelta([], [], [old_row]),
+            sync_to_notion.CsvDelta([old_row, new_row], [], []),
+        ])
+        assert delta.added == [new_row] and not delta.modified and not delta.removed, delta
+        
+        # The same experiment changed differently in two files is a conflict
+        changed = sync_to_notion.ExperimentRow(dict(old_row.to_dict(), Objectives="Changed"))
+        try:
+            sync_to_notion.merge_deltas([
+                sync_to_notion.CsvDelta([], [old_row], []),
+                sync_to_notion.CsvDelta([], [changed], []),
+            ])
+            print("✗ Conflicting changes were not detected")
+            return False
+        except sync_to_notion.SyncError as e:
+            assert "differently" in str(e), e
+        
+        # A duplicate removed from one shard is still defined in the other
+        repo = os.path.join(tmp, "repo")
+        subprocess.run(["git", "init", "-q", repo], check=True, capture_output=True)
+        shard_a, shard_b = os.path.join(repo, "a.csv"), os.path.join(repo, "b.csv")
+        
+        def write_shards(a_rows, b_rows):
+            for path, shard in ((shard_a, a_rows), (shard_b, b_rows)):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.writelines([header] + shard)
+        
+        write_shards(rows[:3], rows[:1] + rows[3:5])
+        first = git_commit_all(repo, "shards")
+        write_shards(rows[1:3], rows[:1] + rows[3:5])
+        second = git_commit_all(repo, "remove duplicate from a.csv")
+        write_shards(rows[1:3], rows[3:5])
+        third = git_commit_all(repo, "remove it from b.csv too")
+        
+        delta = sync_to_notion.load_changes([shard_a, shard_b], first, second)
+        assert len(delta) == 0, delta
+        delta = sync_to_notion.load_changes([shard_a, shard_b], second, third)
+        assert [row.Experiment_Name for row in delta.removed] == [read_csv_data()[0].Experiment_Name], delta
+        
+        # A deleted shard is still diffed, so its rows are archived
+        os.remove(shard_b)
+        fourth = git_commit_all(repo, "delete b.csv")
+        files = sync_to_notion.expand_inputs(repo, (third, fourth))
+        assert files == [shard_a, shard_b], files
+        delta = sync_to_notion.load_changes(files, third, fourth)
+        assert not delta.added and not delta.modified, delta
+        assert sorted(row.Experiment_Name for row in delta.removed) == sorted(
+            row.Experiment_Name for row in read_csv_data()[3:5]), delta
+        
+        print(f"✓ Merged {len(merged)} experiments from {len(paths)} files")
+        return True
+    except Exception as e:
+        print(f"✗ Multi-file ingestion failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_adaptive_concurrency():
+    """Test that write concurrency backs off on 429s and is remembered."""
+    print("\nTesting adaptive concurrency...")
+    
+    tmp = tempfile.mkdtemp()
+    try:
+        controller = sync_to_notion.ConcurrencyController()
+        for _ in range(20):
+            controller.record(time.monotonic(), 0.1)
+        grown = controller.limit
+        assert grown > 4, grown
+        
+        controller.record(time.monotonic(), 0.1, api_error(429, APIErrorCode.RateLimited))
+        assert controller.limit == grown * sync_to_notion.DECREASE_FACTOR, controller.limit
+        
+        # Requests sent before a decrease don't cut the limit again
+        controller.record(0.0, 0.1, api_error(429, APIErrorCode.RateLimited))
+        assert controller.limit == grown * sync_to_notion.DECREASE_FACTOR, controller.limit
+        
+        # Latency spikes count as congestion; per-row errors don't
+        halved = controller.limit
+        controller.record(time.monotonic(), 2.0)
+        assert controller.limit == max(halved * sync_to_notion.DECREASE_FACTOR, 1), controller.limit
+        low = controller.limit
+        controller.record(time.monotonic(), 0.1, api_error(400, APIErrorCode.ValidationError))
+        assert controller.limit == low
+        
+        # A stand-in that answers 429 whenever more than 3 writes are in flight
+        capacity = 3
+        in_flight = [0]
+        lock = threading.Lock()
+        notion = FakeNotion()
+        
+        def create(parent, properties):
+            with lock:
+                in_flight[0] += 1
+                overloaded = in_flight[0] > capacity
+            try:
+                time.sleep(0.01)
+                if overloaded:
+                    raise api_error(429, APIErrorCode.RateLimited, headers={"retry-after": "0.05"})
+                return {"id": "new"}
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+        notion.pages.create.handler = create
+        
+        state_file = os.path.join(tmp, "state.json")
+        rows = [sync_to_notion.ExperimentRow({"Experiment_Name": f"Experiment {i}"}) for i in range(200)]
+        result = sync_to_notion.write_changes(notion, "db", rows, probe=False,
+                                              database_size=0, state_file=state_file)
+        assert result["created"] == 200 and not result["errors"], result
+        
+        with open(state_file, 'r', encoding='utf-8') as f:
+            learned = json.load(f)["db"]["concurrency"]
+        assert 1 <= learned <= capacity + 1, learned
+        assert sync_to_notion.ConcurrencyController.load("db", state_file).limit == learned
+        
+        # Each database keeps its own learned limit
+        other = sync_to_notion.ConcurrencyController(6)
+        other.requests = sync_to_notion.MIN_LEARNING_REQUESTS
+        other.save("other-db", state_file)
+        assert sync_to_notion.ConcurrencyController.load("db", state_file).limit == learned
+        assert sync_to_notion.ConcurrencyController.load("other-db", state_file).limit == 6
+        assert sync_to_notion.ConcurrencyController.load("new-db", state_file).limit == 1
+        
+        # Queueing behind the local rate limiter is not a latency spike
+        limiter = sync_to_notion.RateLimiter(rate=4)
+        controller = sync_to_notion.ConcurrencyController(4)
+        
+        def limited_request():
+            limiter.acquire()
+            time.sleep(0.01)
+            return {}
+        for _ in range(8):
+            controller.timed(limited_request)()
+        assert controller.limit > 4, f"limit fell to {controller.limit} while waiting on the limiter"
+        assert controller.baseline_latency < 0.1, controller.baseline_latency
+        
+        print(f"✓ Learned concurrency {learned} against a capacity of {capacity}")
+        return True
+    except Exception as e:
+        print(f"✗ Adaptive concurrency failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def git_commit_all(repo, message):
+    """Commit everything in a scratch repository and return the new SHA."""
+    git = ["git", "-C", repo, "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["add", "-A"], check=True, capture_output=True)
+    subprocess.run(git + ["commit", "-q", "-m", message], check=True, capture_output=True)
+    return subprocess.run(git + ["rev-parse", "HEAD"], check=True, capture_output=True,
+                          text=True).stdout.strip()
+
+
+def test_git_delta():
+    """Test that only rows changed between two revisions are synced."""
+    print("\nTesting git revision delta...")
+    
+    csv_path = os.path.abspath(sync_to_notion.CSV_FILE)
+    original_cwd = os.getcwd()
+    repo = tempfile.mkdtemp()
+    try:
+        subprocess.run(["git", "init", "-q", repo], check=True, capture_output=True)
+        shutil.copy(csv_path, os.path.join(repo, sync_to_notion.CSV_FILE))
+        first = git_commit_all(repo, "initial")
+        
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines(keepends=True)
+        edited = lines[1].replace(",Completed 2023,", ",Completed 2024,", 1)
+        assert edited != lines[1], "fixture row should contain 'Completed 2023'"
+        added = lines[2].replace(",", " II,", 2)
+        new_lines = [lines[0], edited] + lines[2:-1] + [added]
+        with open(os.path.join(repo, sync_to_notion.CSV_FILE), 'w', encoding='utf-8') as f:
+            f.writelines(new_lines)
+        second = git_commit_all(repo, "edit")
+        
+        # An absolute path into another repository, from outside its root
+        repo_csv = os.path.join(repo, sync_to_notion.CSV_FILE)
+        delta = sync_to_notion.read_csv_delta(first, second, repo_csv)
+        assert [row.Timeline_Status for row in delta.modified] == ["Completed 2024"], delta
+        assert len(delta.added) == 1 and delta.added[0].Experiment_Name.endswith(" II"), delta
+        assert len(delta.removed) == 1, delta
+        
+        # --since resolves against the input's repository, not the current one
+        root = sync_to_notion.repository_root(repo_csv)
+        since = sync_to_notion.resolve_since("tomorrow", root)
+        assert since == sync_to_notion.resolve_revision("HEAD", root), since
+        
+        initial = sync_to_notion.read_csv_delta(sync_to_notion.NULL_REVISION, first, repo_csv)
+        assert len(initial.added) == len(lines) - 1 and not initial.modified
+        
+        # A quoted field spanning two lines falls back to a full comparison
+        rows = list(csv.DictReader(open(repo_csv, 'r', encoding='utf-8')))
+        rows[5]["Objectives"] = "First paragraph,\nsecond paragraph"
+        with open(repo_csv, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]), lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(rows)
+        third = git_commit_all(repo, "multi-line objectives")
+        delta = sync_to_notion.read_csv_delta(second, third, repo_csv)
+        assert not delta.added and not delta.removed, delta
+        assert [row.Objectives for row in delta.modified] == ["First paragraph,\nsecond paragraph"], delta
+        
+        try:
+            sync_to_notion.read_csv_delta(first, second, os.path.join(repo, "untracked.csv"))
+            print("✗ Untracked file was not reported")
+            return False
+        except sync_to_notion.SyncError:
+            pass
+        
+        os.chdir(repo)
+        
+        notion = FakeNotion()
+        sync_to_notion.sync_to_notion(notion, before=third, after=third)
+        api_calls = (len(notion.databases.retrieve.calls) + len(notion.databases.query.calls)
+                     + notion.write_calls())
+        assert api_calls == 0, f"expected no API calls for an empty delta, got {api_calls}"
+        
+        print(f"✓ Delta: {len(delta.added)} added, {len(delta.modified)} modified, "
+              f"{len(delta.removed)} removed; empty delta made no API calls")
+        return True
+    except Exception as e:
+        print(f"✗ Git delta failed: {e}")
+        return False
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(repo, ignore_errors=True)
+
+
 if __name__ == "__main__":
     print("="*60)
     print("Tiangong Database - Notion Sync Test Suite")
@@ -101,6 +776,15 @@ if __name__ == "__main__":
     results.append(("CSV Parsing", test_csv_parsing()))
     results.append(("Property Creation", test_property_creation()))
     results.append(("CSV Completeness", test_csv_completeness()))
+    results.append(("Compact Rows", test_compact_rows()))
+    results.append(("Error Classification", test_error_classification()))
+    results.append(("Circuit Breaker", test_circuit_breaker()))
+    results.append(("Database Probe", test_database_probe()))
+    results.append(("Git Delta", test_git_delta()))
+    results.append(("Targeted Lookup", test_targeted_lookup()))
+    results.append(("Sync Service", test_sync_service()))
+    results.append(("Multi-File Ingestion", test_multi_file_ingestion()))
+    results.append(("Adaptive Concurrency", test_adaptive_concurrency()))
     
     print("\n" + "="*60)
     print("Test Results:")